@@ -0,0 +1,66 @@
+import os
+import matplotlib
+from matplotlib.figure import Figure
+
+# Figure is created on first use and cleared between calls instead of
+# being rebuilt (and the font cache re-warmed) for every render. It is a
+# plain Figure, not registered with pyplot, so it needs no plt.close() and
+# is freed with this module.
+_fig = None
+_ax = None
+
+
+def render(schedule, nodes, path, title):
+    """Draw each node's tasks as bars laid end to end and save to path."""
+    global _fig, _ax
+    if _fig is None:
+        _fig = Figure(figsize=(12, 6))
+        _ax = _fig.subplots()
+    else:
+        _ax.clear()
+    fig, ax = _fig, _ax
+    colors = matplotlib.colormaps["tab10"].colors
+
+    node_names = list(nodes.keys())
+    y_positions = {node: i for i, node in enumerate(node_names)}
+
+    for node_idx, (node, tasks) in enumerate(schedule.items()):
+        # One collection per node: (left, width) for each task laid end to end
+        xranges = []
+        current_pos = 0
+        for task in tasks:
+            task_id, cost, value = task
+            xranges.append((current_pos, cost))
+            ax.text(
+                current_pos + cost / 2,
+                y_positions[node],
+                f"{task_id}\n{cost}",
+                ha="center",
+                va="center",
+                color="white",
+                fontsize=9,
+                fontweight="bold"
+            )
+            current_pos += cost
+
+        ax.broken_barh(
+            xranges,
+            (y_positions[node] - 0.3, 0.6),
+            facecolors=colors[node_idx % len(colors)],
+            edgecolor="black",
+            linewidth=1.5
+        )
+
+    ax.set_yticks(range(len(node_names)))
+    ax.set_yticklabels(node_names)
+    ax.set_xlabel("Capacity Used", fontsize=12)
+    ax.set_ylabel("Nodes", fontsize=12)
+    ax.set_title(title, fontsize=14, fontweight="bold")
+    ax.grid(axis='x', alpha=0.3)
+
+    fig.tight_layout()
+
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    fig.savefig(path, dpi=150, bbox_inches='tight')